@@ -1,7 +1,10 @@
 import logging
+import os
+import select
 import serial
 import time
 from abc import ABC, abstractmethod
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +12,9 @@ logger = logging.getLogger(__name__)
 class BaseConnector(ABC):
     """Base class for OBD2 connectors."""
 
+    # send_command() accepts '\r'-batched commands with prompts=N
+    BATCHES_COMMANDS = True
+
     def __init__(self, port: str, baudrate: int = 38400, timeout: int = 1):
         self.port = port
         self.baudrate = baudrate
@@ -26,20 +32,58 @@ class BaseConnector(ABC):
     def is_connected(self) -> bool:
         return self.connection is not None and self.connection.is_open
 
-    def send_command(self, command: str) -> str:
+    def _fileno(self) -> Optional[int]:
+        """Return the OS file descriptor of the port, or None if it has none."""
+        try:
+            fd = self.connection.fileno()
+        except (AttributeError, OSError, ValueError):
+            return None
+        return fd if isinstance(fd, int) else None
+
+    def send_command(self, command: str, prompts: int = 1) -> str:
+        """
+        Send *command* and read until *prompts* '>' prompts have arrived.
+
+        Several commands may be batched into one write by separating them
+        with '\r'; pass the number of commands as *prompts* so the reply to
+        each one is collected before returning.
+
+        Once initialize() has run, echo and linefeeds are off, so replies
+        contain no echoed command and lines end in a bare '\r'.
+
+        Raises serial.SerialException if the adapter hangs up mid-read.
+        """
         if not self.is_connected():
             raise ConnectionError("Not connected to OBD2 device.")
         self.connection.write((command.strip() + "\r").encode())
         response = b""
+        # On POSIX ports wait on the descriptor so we wake as soon as bytes
+        # arrive; otherwise (Windows, test doubles) poll in_waiting.
+        fd = self._fileno()
         deadline = time.time() + self.timeout
         while time.time() < deadline:
-            if self.connection.in_waiting:
-                chunk = self.connection.read(self.connection.in_waiting)
-                response += chunk
-                if b">" in response:
+            if fd is not None:
+                ready, _, _ = select.select([fd], [], [], max(0.0, deadline - time.time()))
+                if not ready:
                     break
+                try:
+                    chunk = os.read(fd, 4096)
+                except (BlockingIOError, InterruptedError):
+                    # Spurious wakeup on the non-blocking port; wait again
+                    continue
+                if not chunk:
+                    # Readable but empty means the adapter hung up
+                    raise serial.SerialException("Device disconnected while reading")
             else:
-                time.sleep(0.01)
+                # Query the queue once and drain all of it in a single read
+                waiting = self.connection.in_waiting
+                if not waiting:
+                    time.sleep(0.01)
+                    continue
+                chunk = self.connection.read(waiting)
+            response += chunk
+            if response.count(b">") >= prompts:
+                break
         return response.decode(errors="ignore").rstrip(">").strip()
 
     def reset(self) -> str:
@@ -64,12 +108,14 @@ class BaseConnector(ABC):
         try:
             self.reset()
             time.sleep(1)
+            # Echo and linefeeds go first so every later reply is bare
+            # '\r'-terminated data
             self.echo_off()
             self.linefeeds_off()
             self.headers_off()
             self.spaces_off()
             self.set_auto_protocol()
             return True
-        except Exception as e:
+        except OSError as e:  # includes serial.SerialException and TimeoutError
             logger.error("[ERROR] Initialization failed: %s", e)
             return False
@@ -9,39 +9,58 @@ from typing import Any, Callable, Dict, Optional
 from .commands import OBD_PIDS, VEHICLE_INFO_PIDS
 
 
+# PIDs read by OBDReader.read_all(), in order. MIL_STATUS is excluded from
+# bulk scans (use read_mil_status() instead).
+BULK_SCAN_KEYS = tuple(key for key in OBD_PIDS if key != "MIL_STATUS")
+
+
 # ---------------------------------------------------------------------------
 # Raw response helpers
 # ---------------------------------------------------------------------------
 
+_HEX_DIGITS = frozenset("0123456789ABCDEF")
+
+
+def _hex_bytes(raw: str) -> bytes:
+    """Decode every two-digit hex token in an ELM327 response in one call."""
+    tokens = raw.upper().split()
+    return bytes.fromhex("".join(t for t in tokens if len(t) == 2 and _HEX_DIGITS.issuperset(t)))
+
+
+def _extract_data(raw: str, response_mode: int, pid: int) -> Optional[bytes]:
+    """
+    Return the data bytes that follow *response_mode* and *pid* in a response,
+    or None when the response does not contain them.
+    """
+    data = _hex_bytes(raw)
+    idx = data.find(response_mode)
+    if idx < 0:
+        return None
+    # Validate that the next byte matches the expected PID
+    if idx + 1 < len(data) and data[idx + 1] != pid:
+        return None
+    # Data bytes start after response_mode + PID
+    return data[idx + 2:] or None
+
+
 def _parse_hex_response(raw: str, mode: str, pid: str) -> Optional[list]:
     """
     Extract the data bytes from an ELM327 response string.
 
     Returns a list of integer byte values, or None on error.
     """
-    raw = raw.strip().upper().replace("\r", " ").replace("\n", " ")
-    # Remove echo (command may be echoed back)
-    expected_header = (mode + pid).upper()
-    lines = raw.split()
-
-    # Collect only hex tokens
-    hex_tokens = [t for t in lines if all(c in "0123456789ABCDEF" for c in t) and len(t) == 2]
+    # The response mode is request mode + 0x40
+    data = _extract_data(raw, int(mode, 16) + 0x40, int(pid, 16))
+    return list(data) if data else None
 
-    if not hex_tokens:
-        return None
 
-    # The response mode is request mode + 0x40
-    response_mode = format(int(mode, 16) + 0x40, "02X")
-    try:
-        idx = hex_tokens.index(response_mode)
-        # Validate that the next token matches the expected PID
-        if idx + 1 < len(hex_tokens) and hex_tokens[idx + 1] != pid.upper():
-            return None
-        # Data bytes start after response_mode + PID
-        data = hex_tokens[idx + 2:]
-        return [int(b, 16) for b in data] if data else None
-    except (ValueError, IndexError):
-        return None
+# Everything read_pid needs per PID, resolved once at import:
+#   key -> (command, response mode byte, PID byte, data byte count, parser)
+_PID_REQUESTS = {
+    key: (info["mode"] + info["pid"], int(info["mode"], 16) + 0x40, int(info["pid"], 16),
+          info["bytes"], info["parse"])
+    for key, info in OBD_PIDS.items()
+}
 
 
 # ---------------------------------------------------------------------------
@@ -66,16 +85,16 @@ class OBDReader:
 
         Returns the parsed numeric value, or None if unavailable/error.
         """
-        if key not in OBD_PIDS:
+        request = _PID_REQUESTS.get(key)
+        if request is None:
             raise ValueError(f"Unknown PID key: '{key}'. Available: {list(OBD_PIDS)}")
 
-        info = OBD_PIDS[key]
-        cmd = info["mode"] + info["pid"]
+        cmd, response_mode, pid, nbytes, parse = request
         try:
             raw = self.connector.send_command(cmd)
-            data = _parse_hex_response(raw, info["mode"], info["pid"])
-            if data and len(data) >= info["bytes"]:
-                return info["parse"](data[:info["bytes"]])
+            data = _extract_data(raw, response_mode, pid)
+            if data and len(data) >= nbytes:
+                return parse(data[:nbytes])
         except Exception:
             pass
         return None
@@ -91,9 +110,7 @@ class OBDReader:
         MIL_STATUS is excluded from bulk scans (use read_mil_status() instead).
         """
         results: Dict[str, Any] = {}
-        for key in OBD_PIDS:
-            if key == "MIL_STATUS":
-                continue
+        for key in BULK_SCAN_KEYS:
             results[key] = self.read_pid(key)
         return results
 
@@ -133,7 +150,11 @@ class OBDReader:
         """
         try:
             return self.connector.send_command("04")
-        except Exception as exc:
+        except OSError as exc:
+            # Unlike the read-only helpers this is a destructive write, so only
+            # port failures become an "ERROR:" reply; anything else is a bug
+            # and propagates. serial.SerialException and TimeoutError are
+            # OSError subclasses.
             return f"ERROR: {exc}"
 
     # ------------------------------------------------------------------
@@ -297,31 +318,20 @@ _DTC_FIRST_CHAR = {
 
 def _parse_dtcs(raw: str) -> list:
     """Parse a Mode 03 / 07 response into a list of DTC strings."""
-    raw = raw.strip().upper().replace("\r", " ").replace("\n", " ")
-    tokens = raw.split()
-    hex_tokens = [t for t in tokens if all(c in "0123456789ABCDEF" for c in t) and len(t) == 2]
+    data = _hex_bytes(raw)
 
     # Skip the leading response mode byte (43 = Mode 03, 47 = Mode 07)
-    if hex_tokens and hex_tokens[0] in ("43", "47"):
-        hex_tokens = hex_tokens[1:]
-
-    dtcs = []
-    i = 0
-    while i + 1 < len(hex_tokens):
-        high = int(hex_tokens[i], 16)
-        low = int(hex_tokens[i + 1], 16)
-        i += 2
-        if high == 0 and low == 0:
-            continue
-        system = (high & 0xC0) >> 6
-        prefix = _DTC_FIRST_CHAR.get(system, "P")
-        digit2 = (high & 0x30) >> 4
-        digit3 = high & 0x0F
-        digit4 = (low & 0xF0) >> 4
-        digit5 = low & 0x0F
-        dtc = f"{prefix}{digit2}{digit3:X}{digit4:X}{digit5:X}"
-        dtcs.append(dtc)
-    return dtcs
+    if data[:1] in (b"\x43", b"\x47"):
+        data = data[1:]
+
+    # Pack each byte pair into one 16-bit code, dropping 00 00 padding
+    codes = [(high << 8) | low for high, low in zip(data[::2], data[1::2])]
+    # Bits 15-14: system letter, 13-12: first digit, 11-0: remaining three hex digits
+    return [
+        f"{_DTC_FIRST_CHAR[code >> 14]}{(code >> 12) & 0x3}{code & 0xFFF:03X}"
+        for code in codes
+        if code
+    ]
 
 
 def _parse_vin(raw: str) -> str:
@@ -4,10 +4,15 @@ OBD2 writer – send raw AT and OBD2 commands to the vehicle.
 
 from .commands import AT_COMMANDS
 
+# Precomputed once so the unknown-name error path does not rebuild the list
+_AT_COMMAND_NAMES = tuple(AT_COMMANDS)
+
 
 class OBDWriter:
     """Sends commands to the vehicle through a BaseConnector."""
 
+    __slots__ = ("connector",)
+
     def __init__(self, connector):
         self.connector = connector
 
@@ -15,13 +20,18 @@ class OBDWriter:
     # Raw command
     # ------------------------------------------------------------------
 
-    def send_raw(self, command: str) -> str:
+    def send_raw(self, command: str, prompts: int = 1) -> str:
         """
         Send any raw AT or OBD2 command string.
 
+        *prompts* is the number of '\r'-separated commands batched in
+        *command*; only connectors with BATCHES_COMMANDS accept more than one.
+
         Returns the raw response string from the ELM327.
         """
-        return self.connector.send_command(command)
+        if prompts == 1:
+            return self.connector.send_command(command)
+        return self.connector.send_command(command, prompts=prompts)
 
     # ------------------------------------------------------------------
     # Named AT commands
@@ -36,7 +46,7 @@ class OBDWriter:
         if name not in AT_COMMANDS:
             raise ValueError(
                 f"Unknown AT command name: '{name}'. "
-                f"Available: {list(AT_COMMANDS)}"
+                f"Available: {_AT_COMMAND_NAMES}"
             )
         return self.send_raw(AT_COMMANDS[name])
 
@@ -98,6 +108,20 @@ class OBDWriter:
         """
         return self.send_raw(f"AT CM {mask.upper()}")
 
+    def set_can_filter_mask(self, can_filter: str, mask: str) -> str:
+        """
+        Set the CAN receive filter and mask (AT CF <filter> + AT CM <mask>),
+        in a single round trip when the connector can batch commands.
+
+        Returns both replies separated by '\r', e.g. "OK\rOK".
+        """
+        commands = (f"AT CF {can_filter.upper()}", f"AT CM {mask.upper()}")
+        if not getattr(self.connector, "BATCHES_COMMANDS", False):
+            return "\r".join(self.send_raw(cmd) for cmd in commands)
+        # Every reply but the last still carries its '>' prompt
+        raw = self.send_raw("\r".join(commands), prompts=len(commands))
+        return "\r".join(reply.strip() for reply in raw.split(">"))
+
     # ------------------------------------------------------------------
     # Timing
     # ------------------------------------------------------------------
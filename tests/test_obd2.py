@@ -2,10 +2,15 @@
 Unit tests for OBD2 connector modules (no hardware required).
 """
 
+import json
+import os
 import time
 import threading
 import unittest.mock as mock
+from datetime import datetime
+
 import pytest
+import serial
 
 from obd.commands import OBD_PIDS, AT_COMMANDS, VEHICLE_INFO_PIDS
 from obd.reader import (
@@ -15,7 +20,17 @@ from obd.reader import (
     _parse_vin,
     _parse_ascii_info,
 )
+from obd.writer import OBDWriter
+from connector.bluetooth import BluetoothConnector
 from utils.export import export_csv, export_csv_log, export_json
+from web.app import (
+    create_app,
+    _compute_demo_sensors,
+    _demo_sensors,
+    _StreamHub,
+    _DEMO_DTCS,
+    _DEMO_PENDING_DTCS,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -137,6 +152,10 @@ class TestParseDTCs:
         assert "P0143" in dtcs
         assert "P0405" in dtcs
 
+    def test_system_letters(self):
+        # 47 (Mode 07) + 41 23 (C0123) + 9A BC (B1ABC) + C1 00 (U0100)
+        assert _parse_dtcs("47 41 23 9A BC C1 00") == ["C0123", "B1ABC", "U0100"]
+
 
 # ---------------------------------------------------------------------------
 # obd/reader.py – _parse_vin
@@ -196,6 +215,12 @@ class TestOBDReader:
         dtcs = reader.read_dtcs()
         assert dtcs == []
 
+    def test_clear_dtcs_reports_io_error(self):
+        stub = _StubConnector()
+        stub.send_command = mock.Mock(side_effect=ConnectionError("link lost"))
+        reader = OBDReader(stub)
+        assert reader.clear_dtcs() == "ERROR: link lost"
+
     def test_get_protocol(self):
         stub = _StubConnector("ISO 15765-4 (CAN 11/500)")
         reader = OBDReader(stub)
@@ -266,6 +291,24 @@ class TestExport:
         assert "RPM" in content
         assert "1200" in content
 
+    def test_export_csv_log_aligns_columns(self, tmp_path):
+        rows = [
+            {"RPM": 800, "_timestamp": None},
+            {"SPEED": 30, "RPM": None, "_internal": "skip"},
+        ]
+        export_csv_log(rows, path=str(tmp_path / "cols.csv"))
+        lines = (tmp_path / "cols.csv").read_text().splitlines()
+        assert lines == ["timestamp,RPM,SPEED", ",800,", ",,30"]
+
+    def test_export_csv_log_timestamps_match_isoformat(self, tmp_path):
+        base = 1700000000.0
+        stamps = [base, base + 0.25, base + 0.9999996, base + 1.5, base + 61.000001]
+        export_csv_log([{"RPM": 1, "_timestamp": t} for t in stamps], path=str(tmp_path / "ts.csv"))
+        lines = (tmp_path / "ts.csv").read_text().splitlines()[1:]
+        assert [line.split(",")[0] for line in lines] == [
+            datetime.fromtimestamp(t).isoformat() for t in stamps
+        ]
+
     def test_export_csv_log_empty_raises(self):
         with pytest.raises(ValueError):
             export_csv_log([])
@@ -273,7 +316,6 @@ class TestExport:
     def test_export_json_creates_file(self, tmp_path):
         data = [{"RPM": 900, "SPEED": 40, "_timestamp": time.time()}]
         path = export_json(data, path=str(tmp_path / "out.json"))
-        import json
         loaded = json.loads((tmp_path / "out.json").read_text())
         assert isinstance(loaded, list)
         assert loaded[0]["RPM"] == 900
@@ -353,8 +395,6 @@ class TestSendCommand:
 
     def _make_connector_with_serial(self, response_bytes: bytes):
         """Return a BluetoothConnector whose serial port returns the given bytes."""
-        from connector.bluetooth import BluetoothConnector
-
         conn = BluetoothConnector.__new__(BluetoothConnector)
         conn.timeout = 1
 
@@ -388,8 +428,6 @@ class TestSendCommand:
 
     def test_returns_empty_on_timeout(self):
         """send_command returns empty string when no data arrives within timeout."""
-        from connector.bluetooth import BluetoothConnector
-
         conn = BluetoothConnector.__new__(BluetoothConnector)
         conn.timeout = 0.1  # very short timeout
 
@@ -408,26 +446,110 @@ class TestSendCommand:
         assert ">" not in result
         assert "OK" in result
 
+    def test_waits_for_multiple_prompts(self):
+        """A batched write collects one reply per command before returning."""
+        conn = self._make_connector_with_serial(b"OK\r>OK\r>")
+        result = conn.send_command("AT CF 7E8\rAT CM 7FF", prompts=2)
+        assert result.count("OK") == 2
+        conn.connection.write.assert_called_once_with(b"AT CF 7E8\rAT CM 7FF\r")
+
+    def test_writer_sets_can_filter_and_mask_in_one_write(self):
+        """OBDWriter batches AT CF + AT CM and returns one clean reply per command."""
+        conn = self._make_connector_with_serial(b"OK\r\r>OK\r\r>")
+        result = OBDWriter(conn).set_can_filter_mask("7e8", "7ff")
+        conn.connection.write.assert_called_once_with(b"AT CF 7E8\rAT CM 7FF\r")
+        assert result == "OK\rOK"
+
+    def test_writer_can_filter_and_mask_without_batching(self):
+        """Connectors without batching get the two commands one at a time."""
+        conn = _StubConnector("OK")
+        sent = []
+        conn.send_command = lambda cmd: sent.append(cmd) or "OK"
+        assert OBDWriter(conn).set_can_filter_mask("7e8", "7ff") == "OK\rOK"
+        assert sent == ["AT CF 7E8", "AT CM 7FF"]
+
+    @pytest.mark.skipif(os.name == "nt", reason="select() on pipes needs a POSIX platform")
+    def test_reads_from_file_descriptor(self):
+        """Ports exposing a real fileno() are read with select/os.read."""
+        rfd, wfd = os.pipe()
+        try:
+            conn = BluetoothConnector.__new__(BluetoothConnector)
+            conn.timeout = 1
+            fake_serial = mock.MagicMock()
+            fake_serial.is_open = True
+            fake_serial.fileno.return_value = rfd
+            conn.connection = fake_serial
+            os.write(wfd, b"41 0D 64\r>")
+            assert conn.send_command("010D") == "41 0D 64"
+            fake_serial.read.assert_not_called()
+        finally:
+            os.close(rfd)
+            os.close(wfd)
+
+    @pytest.mark.skipif(os.name == "nt", reason="select() on pipes needs a POSIX platform")
+    def test_hangup_on_file_descriptor_raises(self):
+        """A readable descriptor that returns no data is a hangup, not a timeout."""
+        rfd, wfd = os.pipe()
+        os.close(wfd)
+        try:
+            conn = BluetoothConnector.__new__(BluetoothConnector)
+            conn.timeout = 1
+            fake_serial = mock.MagicMock()
+            fake_serial.is_open = True
+            fake_serial.fileno.return_value = rfd
+            conn.connection = fake_serial
+            with pytest.raises(serial.SerialException):
+                conn.send_command("010D")
+        finally:
+            os.close(rfd)
+
+
+# ---------------------------------------------------------------------------
+# web/app.py – shared demo client
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def demo_client():
+    """One demo-mode test client shared by the read-only web tests."""
+    app = create_app(demo=True)
+    with app.test_client() as c:
+        yield c
+
+
+def _first_stream_event(client) -> dict:
+    """Open /api/stream on *client* and return its first event, decoded."""
+    r = client.get("/api/stream", buffered=False)
+    try:
+        return json.loads(next(iter(r.response))[len(b"data: "):])
+    finally:
+        r.close()
+
 
 # ---------------------------------------------------------------------------
 # web/app.py – timing_advance key alignment
 # ---------------------------------------------------------------------------
 
 class TestDemoSensorKeys:
-    def test_demo_sensors_include_timing_advance(self):
+    def test_demo_sensors_include_timing_advance(self, demo_client):
         """Demo sensor data must use 'timing_advance' to match the live OBD reader key."""
-        from web.app import create_app
-        app = create_app(demo=True)
-        with app.test_client() as c:
-            r = c.get("/api/sensors")
-            data = r.get_json()
-            sensors = data["sensors"]
-            assert "timing_advance" in sensors, (
-                "'timing_advance' key missing – demo data and JS GAUGES must match live reader output"
-            )
-            assert "timing" not in sensors, (
-                "Old 'timing' key still present – should have been renamed to 'timing_advance'"
-            )
+        r = demo_client.get("/api/sensors")
+        data = r.get_json()
+        sensors = data["sensors"]
+        assert "timing_advance" in sensors, (
+            "'timing_advance' key missing – demo data and JS GAUGES must match live reader output"
+        )
+        assert "timing" not in sensors, (
+            "Old 'timing' key still present – should have been renamed to 'timing_advance'"
+        )
+
+    @pytest.mark.parametrize("tick,expected", [
+        (1, 65.0), (3000, 35.0), (6495, 0.1), (6506, 0.0), (10**6, 0.0),
+    ])
+    def test_demo_fuel_level_stays_float(self, tick, expected):
+        """Fuel level drains to 0.0 and stays a float once the tank is empty."""
+        value = _compute_demo_sensors(tick)["fuel_level"]["value"]
+        assert isinstance(value, float)
+        assert value == expected
 
 
 # ---------------------------------------------------------------------------
@@ -435,95 +557,160 @@ class TestDemoSensorKeys:
 # ---------------------------------------------------------------------------
 
 class TestWebApp:
-    def test_demo_app_sensors(self):
-        from web.app import create_app
-        app = create_app(demo=True)
-        with app.test_client() as c:
-            r = c.get("/api/sensors")
-            assert r.status_code == 200
-            data = r.get_json()
-            assert "sensors" in data
-            assert "rpm" in data["sensors"]
-
-    def test_demo_app_status(self):
-        from web.app import create_app
-        app = create_app(demo=True)
-        with app.test_client() as c:
-            r = c.get("/api/status")
-            assert r.status_code == 200
-            d = r.get_json()
-            assert d["connected"] is True
-            assert d["mode"] == "demo"
-
-    def test_demo_app_dtc(self):
-        from web.app import create_app
-        app = create_app(demo=True)
-        with app.test_client() as c:
-            r = c.get("/api/dtc")
-            assert r.status_code == 200
-            d = r.get_json()
-            assert "codes" in d
-
-    def test_demo_app_dtc_clear(self):
-        from web.app import create_app
-        app = create_app(demo=True)
-        with app.test_client() as c:
-            r = c.post("/api/dtc/clear")
-            assert r.status_code == 200
-            d = r.get_json()
-            assert d["success"] is True
-
-    def test_demo_app_vehicle_info(self):
-        from web.app import create_app
-        app = create_app(demo=True)
-        with app.test_client() as c:
-            r = c.get("/api/vehicle_info")
-            assert r.status_code == 200
-            d = r.get_json()
-            assert "vin" in d
-            assert "protocol" in d
-
-    def test_demo_app_command(self):
-        from web.app import create_app
-        app = create_app(demo=True)
-        with app.test_client() as c:
-            r = c.post("/api/command",
-                       json={"command": "AT RV"},
-                       content_type="application/json")
-            assert r.status_code == 200
-            d = r.get_json()
-            assert "response" in d
-
-    def test_demo_app_command_no_body(self):
-        from web.app import create_app
-        app = create_app(demo=True)
-        with app.test_client() as c:
-            r = c.post("/api/command",
-                       json={},
-                       content_type="application/json")
-            assert r.status_code == 400
-
-    def test_demo_app_export_csv(self):
-        from web.app import create_app
-        app = create_app(demo=True)
-        with app.test_client() as c:
-            r = c.get("/api/export")
-            assert r.status_code == 200
-            assert "text/csv" in r.content_type
-
-    def test_demo_app_mil(self):
-        from web.app import create_app
-        app = create_app(demo=True)
+    @pytest.mark.parametrize("path,key,expected", [
+        ("/api/sensors", "sensors", dict),
+        ("/api/status", "connected", bool),
+        ("/api/dtc", "codes", list),
+        ("/api/vehicle_info", "vin", str),
+        ("/api/vehicle_info", "protocol", str),
+        ("/api/mil", "mil_on", (bool, type(None))),
+        ("/api/mil", "dtc_count", int),
+    ])
+    def test_demo_app_endpoint(self, demo_client, path, key, expected):
+        r = demo_client.get(path)
+        assert r.status_code == 200
+        d = r.get_json()
+        assert key in d
+        assert isinstance(d[key], expected)
+
+    def test_demo_app_status(self, demo_client):
+        d = demo_client.get("/api/status").get_json()
+        assert d["connected"] is True
+        assert d["mode"] == "demo"
+
+    def test_demo_app_dtc_clear(self, demo_client):
+        r = demo_client.post("/api/dtc/clear")
+        assert r.status_code == 200
+        d = r.get_json()
+        assert d["success"] is True
+
+    def test_demo_app_command(self, demo_client):
+        r = demo_client.post("/api/command",
+                             json={"command": "AT RV"},
+                             content_type="application/json")
+        assert r.status_code == 200
+        d = r.get_json()
+        assert "response" in d
+
+    def test_demo_app_command_no_body(self, demo_client):
+        r = demo_client.post("/api/command",
+                             json={},
+                             content_type="application/json")
+        assert r.status_code == 400
+
+    def test_demo_sensors_share_snapshot_within_tick(self, demo_client, monkeypatch):
+        monkeypatch.setattr("web.app._DEMO_MIN_TICK_PERIOD", 60)
+        first = demo_client.get("/api/sensors")
+        second = demo_client.get("/api/sensors")
+        assert first.get_data() == second.get_data()
+        assert first.get_json()["sensors"] == _demo_sensors()
+
+    def test_demo_app_stream_event(self, demo_client):
+        r = demo_client.get("/api/stream", buffered=False)
+        try:
+            first = next(iter(r.response))
+        finally:
+            r.close()
+        assert first.startswith(b"data: ") and first.endswith(b"\n\n")
+        event = json.loads(first[len(b"data: "):])
+        schema = demo_client.get("/api/sensors/schema").get_json()
+        assert len(event["values"]) == len(schema["names"]) == len(schema["units"])
+        rpm = event["values"][schema["names"].index("rpm")]
+        assert isinstance(rpm, float)
+        assert event["status"]["mode"] == "demo"
+        assert "timestamp" in event
+
+    @pytest.mark.parametrize("data", [b"", b"not json", b"[1, 2]", b"null"])
+    def test_demo_app_command_bad_body(self, demo_client, data):
+        r = demo_client.post("/api/command", data=data,
+                             content_type="application/json")
+        assert r.status_code == 400
+
+    def test_demo_app_stream_shares_events(self, demo_client):
+        first = demo_client.get("/api/stream", buffered=False)
+        second = demo_client.get("/api/stream", buffered=False)
+        try:
+            assert next(iter(first.response)) == next(iter(second.response))
+        finally:
+            first.close()
+            second.close()
+
+    def test_stream_hub_fans_out_and_stops(self):
+        counter = iter(range(1, 1000))
+        hub = _StreamHub(lambda: str(next(counter)).encode(), lambda: 0.01)
+        hub.subscribe()
+        hub.subscribe()
+        seq, payload = hub.wait(0)
+        assert hub.wait(0) == (seq, payload)
+        assert hub.wait(seq)[0] > seq
+        hub.unsubscribe()
+        hub.unsubscribe()
+        deadline = time.monotonic() + 1
+        while hub._thread is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert hub._thread is None
+
+    def test_stream_hub_survives_build_error(self):
+        calls = iter(range(1, 1000))
+
+        def build():
+            n = next(calls)
+            if n == 1:
+                raise OSError("port closed")
+            return str(n).encode()
+
+        hub = _StreamHub(build, lambda: 0.01)
+        hub.subscribe()
+        try:
+            seq, payload = hub.wait(0)
+            assert json.loads(payload[len(b"data: "):]) == {"error": "port closed"}
+            assert hub.wait(seq)[1].isdigit()
+        finally:
+            hub.unsubscribe()
+
+    @pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+    def test_stream_hub_wait_times_out_and_restarts_producer(self):
+        builds = iter(range(1000))
+
+        def build():
+            # The first producer exits outright (SystemExit is not an error it
+            # reports); the restarted one publishes normally
+            if next(builds) == 0:
+                raise SystemExit
+            return b"data: {}\n\n"
+
+        hub = _StreamHub(build, lambda: 0.01)
+        hub.subscribe()
+        try:
+            assert hub.wait(0) is None
+            assert hub.wait(0)[1] == b"data: {}\n\n"
+        finally:
+            hub.unsubscribe()
+
+    def test_live_app_stream_reports_status_error(self):
+        conn = mock.MagicMock(port="/dev/rfcomm0")
+        conn.is_connected.side_effect = OSError("device gone")
+        reader = mock.MagicMock()
+        reader.read_all.return_value = {}
+        app = create_app(connector=conn, reader=reader, demo=False)
         with app.test_client() as c:
-            r = c.get("/api/mil")
-            assert r.status_code == 200
-            d = r.get_json()
-            assert "mil_on" in d
+            for _ in range(2):
+                assert _first_stream_event(c) == {"error": "device gone"}
+
+    def test_demo_app_export_csv(self, demo_client):
+        r = demo_client.get("/api/export")
+        assert r.status_code == 200
+        assert "text/csv" in r.content_type
+        lines = r.get_data(as_text=True).splitlines()
+        assert lines[0] == "timestamp,sensor,value,unit,error"
+        rpm_row = next(line.split(",") for line in lines[1:] if line.split(",")[1] == "rpm")
+        assert rpm_row[-1] == ""  # no error column value for healthy sensors
+        # File name and rows come from the same clock reading
+        stamp = datetime.fromisoformat(lines[1].split(",")[0]).strftime("%Y%m%d_%H%M%S")
+        assert f"obd2_data_{stamp}.csv" in r.headers["Content-Disposition"]
 
     def test_live_app_dtc_uses_reader_read_dtcs(self):
         """Verify that the live app calls reader.read_dtcs() (not read_dtc())."""
-        from web.app import create_app
-
         class _FakeReader:
             def read_dtcs(self):
                 return ["P0143"]
@@ -537,8 +724,6 @@ class TestWebApp:
 
     def test_live_app_dtc_clear_uses_reader(self):
         """Verify that DTC clear uses reader.clear_dtcs() (not writer.clear_dtc())."""
-        from web.app import create_app
-
         class _FakeReader:
             def clear_dtcs(self):
                 return "OK"
@@ -550,32 +735,108 @@ class TestWebApp:
             d = r.get_json()
             assert d["success"] is True
 
-    def test_demo_dtc_returns_sample_codes(self):
-        """Demo mode must return sample DTC codes so users can see the feature."""
-        from web.app import create_app, _DEMO_DTCS
-        app = create_app(demo=True)
+    def test_live_app_sensors_use_pid_units(self):
+        class _FakeReader:
+            def read_all(self):
+                return {"RPM": 850.0, "COOLANT_TEMP": None, "CUSTOM": 1}
+
+        app = create_app(reader=_FakeReader(), demo=False)
         with app.test_client() as c:
-            r = c.get("/api/dtc")
-            assert r.status_code == 200
-            d = r.get_json()
-            assert d["codes"] == _DEMO_DTCS
-            assert len(d["codes"]) > 0, "Demo mode should return at least one sample DTC"
+            sensors = c.get("/api/sensors").get_json()["sensors"]
+        assert sensors["rpm"] == {"value": 850.0, "unit": OBD_PIDS["RPM"]["unit"]}
+        assert sensors["coolant_temp"]["value"] is None
+        assert sensors["custom"] == {"value": 1, "unit": ""}
+
+    def test_live_app_sensors_share_recent_reading(self, monkeypatch):
+        reader = mock.MagicMock()
+        reader.read_all.return_value = {"RPM": 900.0}
+        app = create_app(reader=reader, demo=False)
+        with app.test_client() as c:
+            c.get("/api/sensors")
+            c.get("/api/export")
+            assert reader.read_all.call_count == 1
+            monkeypatch.setattr("web.app._LIVE_SENSORS_MAX_AGE", -1)
+            c.get("/api/sensors")
+        assert reader.read_all.call_count == 2
+
+    def test_live_app_stream_reports_read_error(self):
+        reader = mock.MagicMock()
+        reader.read_all.side_effect = OSError("port closed")
+        app = create_app(reader=reader, demo=False)
+        with app.test_client() as c:
+            event = _first_stream_event(c)
+        assert event["error"] == "port closed"
+        assert "values" not in event  # the page keeps its last readings
 
-    def test_demo_pending_dtc(self):
-        """Demo mode /api/dtc/pending must return pending sample codes."""
-        from web.app import create_app, _DEMO_PENDING_DTCS
-        app = create_app(demo=True)
+    def test_live_app_schema_matches_read_all(self):
+        reader = OBDReader(_StubConnector("NO DATA"))
+        app = create_app(reader=reader, demo=False)
         with app.test_client() as c:
-            r = c.get("/api/dtc/pending")
-            assert r.status_code == 200
-            d = r.get_json()
-            assert "codes" in d
-            assert d["codes"] == _DEMO_PENDING_DTCS
+            schema = c.get("/api/sensors/schema").get_json()
+        assert schema["names"] == [k.lower() for k in reader.read_all()]
+
+    def test_live_app_stream_forwards_readings_outside_schema(self):
+        reader = mock.MagicMock()
+        reader.read_all.return_value = {"RPM": 900.0, "CUSTOM": 7}
+        app = create_app(reader=reader, demo=False)
+        with app.test_client() as c:
+            schema = c.get("/api/sensors/schema").get_json()
+            event = _first_stream_event(c)
+        assert event["values"][schema["names"].index("rpm")] == 900.0
+        assert event["extra"] == {"custom": {"value": 7, "unit": ""}}
+
+    def test_live_app_command_rejects_non_json_body(self):
+        writer = mock.MagicMock()
+        app = create_app(writer=writer, demo=False)
+        with app.test_client() as c:
+            r = c.post("/api/command", data=b'{"command": "04"}',
+                       content_type="text/plain")
+        assert r.status_code == 400
+        writer.send_raw.assert_not_called()
+
+    def test_live_app_status_is_cached(self):
+        conn = mock.MagicMock(port="/dev/rfcomm0")
+        conn.is_connected.return_value = True
+        app = create_app(connector=conn, demo=False)
+        with app.test_client() as c:
+            first = c.get("/api/status").get_json()
+            second = c.get("/api/status").get_json()
+        assert first == second
+        assert first["connected"] is True
+        assert first["port"] == "/dev/rfcomm0"
+        conn.is_connected.assert_called_once()
+
+    def test_live_app_command_invalidates_status(self):
+        conn = mock.MagicMock(port="/dev/rfcomm0")
+        conn.is_connected.return_value = True
+        writer = mock.MagicMock()
+        writer.send_raw.return_value = "OK"
+        app = create_app(connector=conn, writer=writer, demo=False)
+        with app.test_client() as c:
+            c.get("/api/status")
+            conn.is_connected.return_value = False
+            c.post("/api/command", json={"command": "AT Z"})
+            assert c.get("/api/status").get_json()["connected"] is False
+        assert conn.is_connected.call_count == 2
+
+    def test_demo_dtc_returns_sample_codes(self, demo_client):
+        """Demo mode must return sample DTC codes so users can see the feature."""
+        r = demo_client.get("/api/dtc")
+        assert r.status_code == 200
+        d = r.get_json()
+        assert d["codes"] == _DEMO_DTCS
+        assert len(d["codes"]) > 0, "Demo mode should return at least one sample DTC"
+
+    def test_demo_pending_dtc(self, demo_client):
+        """Demo mode /api/dtc/pending must return pending sample codes."""
+        r = demo_client.get("/api/dtc/pending")
+        assert r.status_code == 200
+        d = r.get_json()
+        assert "codes" in d
+        assert d["codes"] == _DEMO_PENDING_DTCS
 
     def test_live_app_pending_dtc_uses_reader(self):
         """Live mode /api/dtc/pending calls reader.read_pending_dtcs()."""
-        from web.app import create_app
-
         class _FakeReader:
             def read_pending_dtcs(self):
                 return ["P0300"]
@@ -587,18 +848,14 @@ class TestWebApp:
             d = r.get_json()
             assert d["codes"] == ["P0300"]
 
-    def test_demo_sensors_all_obd_pids_present(self):
+    def test_demo_sensors_all_obd_pids_present(self, demo_client):
         """Demo sensor data must include all OBD_PIDS keys (minus MIL_STATUS) as lowercase."""
-        from web.app import create_app
-        from obd.commands import OBD_PIDS
-        app = create_app(demo=True)
-        with app.test_client() as c:
-            r = c.get("/api/sensors")
-            d = r.get_json()
-            sensors = d["sensors"]
-            for key in OBD_PIDS:
-                if key == "MIL_STATUS":
-                    continue
-                assert key.lower() in sensors, (
-                    f"Demo sensor missing '{key.lower()}' – web and CLI dash must show the same sensors"
-                )
+        r = demo_client.get("/api/sensors")
+        d = r.get_json()
+        sensors = d["sensors"]
+        for key in OBD_PIDS:
+            if key == "MIL_STATUS":
+                continue
+            assert key.lower() in sensors, (
+                f"Demo sensor missing '{key.lower()}' – web and CLI dash must show the same sensors"
+            )
@@ -4,6 +4,7 @@ CSV and JSON export utilities.
 
 import csv
 import json
+import math
 import os
 from datetime import datetime
 from typing import Any, Dict, List, Optional
@@ -14,6 +15,34 @@ def _default_filename(ext: str) -> str:
     return f"obd2_export_{ts}.{ext}"
 
 
+class _IsoTimestampFormatter:
+    """
+    Format POSIX timestamps exactly like datetime.fromtimestamp(ts).isoformat().
+
+    Session logs are sampled several times per second with increasing
+    timestamps, so the date/time part of the last whole second is cached and
+    only the microseconds are formatted per row.
+    """
+
+    def __init__(self):
+        self._second = None
+        self._prefix = ""
+
+    def __call__(self, ts: float) -> str:
+        # Same split and half-even rounding that datetime.fromtimestamp uses
+        frac, second = math.modf(ts)
+        micros = round(frac * 1e6)
+        if micros >= 1000000:
+            second += 1
+            micros -= 1000000
+        if micros < 0:
+            return datetime.fromtimestamp(ts).isoformat()
+        if second != self._second:
+            self._second = second
+            self._prefix = datetime.fromtimestamp(second).isoformat()
+        return f"{self._prefix}.{micros:06d}" if micros else self._prefix
+
+
 def export_csv(
     data: Dict[str, Any],
     path: Optional[str] = None,
@@ -36,20 +65,20 @@ def export_csv(
         path = _default_filename("csv")
 
     timestamp = data.get("_timestamp")
-    row = {"timestamp": datetime.fromtimestamp(timestamp).isoformat() if timestamp else datetime.now().isoformat()}
+    header = ["timestamp"]
+    values = [datetime.fromtimestamp(timestamp).isoformat() if timestamp else datetime.now().isoformat()]
 
     for key, value in data.items():
         if key.startswith("_"):
             continue
-        row[key] = "" if value is None else value
+        header.append(key)
+        values.append("" if value is None else value)
 
-    file_exists = os.path.isfile(path)
-    mode = "a" if append and file_exists else "w"
-    with open(path, mode, newline="", encoding="utf-8") as fh:
-        writer = csv.DictWriter(fh, fieldnames=list(row.keys()))
-        if not (append and file_exists):
-            writer.writeheader()
-        writer.writerow(row)
+    # Only stat the file when appending; a plain write never needs it
+    appending = append and os.path.isfile(path)
+    with open(path, "a" if appending else "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerows([values] if appending else [header, values])
 
     return path
 
@@ -69,24 +98,33 @@ def export_csv_log(
     if path is None:
         path = _default_filename("csv")
 
-    # Build unified column set
+    # Build unified column set; each distinct key is classified only once
     columns = ["timestamp"]
+    seen = set(columns)
     for row in rows:
         for key in row:
-            if not key.startswith("_") and key not in columns:
-                columns.append(key)
+            if key not in seen:
+                seen.add(key)
+                if not key.startswith("_"):
+                    columns.append(key)
 
-    with open(path, "w", newline="", encoding="utf-8") as fh:
-        writer = csv.DictWriter(fh, fieldnames=columns, extrasaction="ignore")
-        writer.writeheader()
+    data_keys = columns[1:]
+    iso = _IsoTimestampFormatter()
+
+    def _rows():
         for row in rows:
             ts = row.get("_timestamp")
-            out = {"timestamp": datetime.fromtimestamp(ts).isoformat() if ts else ""}
-            for key, val in row.items():
-                if key.startswith("_"):
-                    continue
-                out[key] = "" if val is None else val
-            writer.writerow(out)
+            out = [iso(ts) if ts else ""]
+            for key in data_keys:
+                val = row.get(key)
+                out.append("" if val is None else val)
+            yield out
+
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(columns)
+        # writerows() drains the generator itself; no intermediate lists
+        writer.writerows(_rows())
 
     return path
 
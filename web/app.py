@@ -1,20 +1,37 @@
 """Flask web application for the OBD2 dashboard."""
 
+import csv
+import io
+import itertools
 import json
+import logging
 import math
+import operator
 import time
 import random
 import threading
 from datetime import datetime
+from typing import Callable, Optional
 
-from flask import Flask, Response, jsonify, render_template, request, stream_with_context
+from flask import Flask, Response, jsonify, render_template, request
+from flask.json.provider import DefaultJSONProvider
+
+from obd.commands import OBD_PIDS
+from obd.reader import BULK_SCAN_KEYS
+
+try:  # optional: a much faster encoder for the float-heavy sensor payloads
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # Demo data generator
 # ---------------------------------------------------------------------------
 
-_demo_tick = 0
-_demo_lock = threading.Lock()
+# Demo tick source; next() on itertools.count is atomic under the GIL
+_demo_tick = itertools.count(1)
 
 # Sample fault codes shown in demo mode so users can see the DTC feature
 _DEMO_DTCS = ["P0420", "P0171"]
@@ -23,64 +40,293 @@ _DEMO_PENDING_DTCS = ["P0201"]
 # Rate of demo distance accumulation: distance increases by 1 km every N ticks
 _DEMO_DISTANCE_INCREMENT = 10
 
+# Requests arriving within this many seconds of the last tick share its
+# snapshot, so concurrent dashboards reuse one computation and serialization
+_DEMO_MIN_TICK_PERIOD = 0.05
+
+# Latest demo snapshot: [monotonic time, sensors dict, sensors JSON text or None]
+_demo_cache = None
+
+# Fixed statuses for demo mode and for an app started without a connector
+# (shared; do not mutate)
+_DEMO_STATUS = {"connected": True, "port": "DEMO", "mode": "demo"}
+_NO_CONNECTOR_STATUS = {"connected": False, "port": None, "mode": None}
+
+# Seconds a live connection status is reused before asking the connector again
+_STATUS_CACHE_TTL = 0.5
+
+# A live reading finished this many seconds before a request is reused for it,
+# so the stream and polling clients do not each scan the adapter
+_LIVE_SENSORS_MAX_AGE = 0.5
+
+
+# Simulated waveforms, one row per sensor:
+#   value = clamp(base + amp * sin(t * freq) + uniform(-noise, noise)) rounded to 1/scale
+# lo / hi of None mean "no clamp on that side".
+_DEMO_WAVES = (
+    # name                 base   amp    freq   noise  lo    hi    scale  unit
+    ("rpm",               2150,  1350,  1.0,   50,    None, None, 10,   "rpm"),
+    ("speed",               60,    50,  0.4,    3,    0,    None, 10,   "km/h"),
+    ("coolant_temp",        90,     3,  0.1,    0.5,  None, None, 10,   "°C"),
+    ("throttle",            35,    25,  0.5,    2,    5,    95,   10,   "%"),
+    ("engine_load",         40,    20,  0.3,    2,    10,   90,   10,   "%"),
+    ("intake_temp",         28,     4,  0.08,   0.5,  None, None, 10,   "°C"),
+    ("maf",                  9,     4,  0.6,    0.3,  2,    None, 100,  "g/s"),
+    ("timing_advance",      12,     6,  0.2,    0.5,  None, None, 10,   "°"),
+    ("voltage",           13.8,   0.4,  0.05,   0.05, None, None, 100,  "V"),
+    ("oil_temp",            95,     5,  0.07,   0.5,  None, None, 10,   "°C"),
+    ("map",                100,    10,  0.4,    1,    None, None, 10,   "kPa"),
+    ("fuel_rate",            5,     3,  0.5,    0.2,  0.5,  None, 100,  "L/h"),
+    ("short_fuel_trim_1",    0,     0,  0,      5,    None, None, 10,   "%"),
+    ("long_fuel_trim_1",   1.5,   0.5,  0.02,   0,    None, None, 10,   "%"),
+    ("baro_pressure",      101,   0.5,  0.01,   0,    None, None, 10,   "kPa"),
+    ("ambient_temp",        25,     2,  0.005,  0,    None, None, 10,   "°C"),
+    ("abs_load",            42,    18,  0.3,    2,    10,   90,   10,   "%"),
+    ("evap_pressure",        0,     0,  0,      50,   None, None, 10,   "Pa"),
+)
+
+# Demo phase advances 0.15 rad per tick; sines are read from a lookup table
+_DEMO_PHASE_PER_TICK = 0.15
+_SIN_LUT_SIZE = 8192
+_SIN_LUT = tuple(math.sin(i * 2 * math.pi / _SIN_LUT_SIZE) for i in range(_SIN_LUT_SIZE))
+
+# _DEMO_WAVES with each frequency converted to LUT slots advanced per tick, noise
+# as the full width of its band and missing clamps replaced by infinities, so
+# every row takes the same path
+_DEMO_WAVE_STEPS = tuple(
+    (name, base, amp, freq * _DEMO_PHASE_PER_TICK * _SIN_LUT_SIZE / (2 * math.pi), 2 * noise,
+     -math.inf if lo is None else lo, math.inf if hi is None else hi, scale, unit)
+    for name, base, amp, freq, noise, lo, hi, scale, unit in _DEMO_WAVES
+)
+
+# Private generator for demo noise: independent of anyone seeding the global
+# random module, and random() is cheaper than uniform()
+_demo_rng = random.Random()
+
+
+def _compute_demo_sensors(tick: int, _waves=_DEMO_WAVE_STEPS, _lut=_SIN_LUT,
+                          _random=_demo_rng.random, _floor=math.floor) -> dict:
+    """Return simulated sensor readings for *tick* (all OBD_PIDS sensors).
+
+    The keyword defaults pre-bind hot globals as fast locals; do not pass them.
+    """
+    out = {}
+    mask = _SIN_LUT_SIZE - 1
+    for name, base, amp, step, noise_width, lo, hi, scale, unit in _waves:
+        value = base
+        if amp:
+            value += amp * _lut[int(tick * step) & mask]
+        if noise_width:
+            value += (_random() - 0.5) * noise_width
+        if value < lo:
+            value = lo
+        elif value > hi:
+            value = hi
+        # Round half up with integer math; cheaper than round() and fine for display
+        out[name] = {"value": _floor(value * scale + 0.5) / scale, "unit": unit}
+    # Counters driven directly by the tick rather than a waveform
+    fuel = _floor(650.5 - tick / 10)
+    out["fuel_level"] = {"value": fuel / 10 if fuel > 0 else 0.0, "unit": "%"}
+    out["runtime"] = {"value": tick, "unit": "s"}
+    out["distance_mil"] = {"value": 0, "unit": "km"}
+    out["distance_since_clr"] = {"value": 500 + tick // _DEMO_DISTANCE_INCREMENT, "unit": "km"}
+    out["warmups_since_clr"] = {"value": 5, "unit": "count"}
+    return out
+
+
+def _demo_snapshot() -> list:
+    """Return the cached demo snapshot, advancing the tick if it is stale.
+
+    Lock-free: callers racing on a stale slot each take their own tick and
+    the last one to finish becomes the cached snapshot.
+    """
+    global _demo_cache
+    snapshot = _demo_cache
+    now = time.monotonic()
+    if snapshot is None or now - snapshot[0] >= _DEMO_MIN_TICK_PERIOD:
+        snapshot = [now, _compute_demo_sensors(next(_demo_tick)), None]
+        _demo_cache = snapshot
+    return snapshot
+
+
+def _demo_sensors() -> dict:
+    """Return the current simulated sensor readings (shared; do not mutate)."""
+    return _demo_snapshot()[1]
+
+
+def _demo_sensors_json() -> str:
+    """Return the current demo sensor readings serialised as compact JSON."""
+    snapshot = _demo_snapshot()
+    text = snapshot[2]
+    if text is None:
+        text = snapshot[2] = _to_json(snapshot[1])
+    return text
+
+
+# json.dumps() builds a new encoder whenever options are passed; keep one
+_compact_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _to_json(obj) -> str:
+    """Serialise *obj* as compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return _compact_encode(obj)
+
+
+def _to_json_bytes(obj) -> bytes:
+    """Serialise *obj* as compact UTF-8 JSON, skipping the str round trip under orjson."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return _compact_encode(obj).encode()
+
+
+# Constant demo payloads, encoded once at import
+_DEMO_VEHICLE_INFO_JSON = _to_json({
+    "vin": "1G1JC5SH3A4100001",
+    "ecu_name": "DEMO ECU",
+    "calibration_id": "DEMO-CAL-001",
+    "protocol": "ISO 15765-4 CAN (11 bit, 500 kbaud)",
+    "elm_version": "ELM327 v2.1",
+    "battery_voltage": "12.6V",
+})
+_DEMO_MIL_JSON = _to_json({"mil_on": False, "dtc_count": 0})
+_DEMO_DTC_JSON = _to_json({"codes": _DEMO_DTCS})
+_DEMO_PENDING_DTC_JSON = _to_json({"codes": _DEMO_PENDING_DTCS})
+_DEMO_DTC_CLEAR_JSON = _to_json({"success": True, "demo": True})
+
+
+def _json_response(body) -> Response:
+    """Wrap an already-encoded JSON *body* (str or bytes), bypassing jsonify."""
+    return Response(body, mimetype="application/json")
+
+
+class _OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; installed only when orjson is available."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+# Live reader keys mapped to their web name and unit: {"RPM": ("rpm", "rpm"), ...}
+_LIVE_SENSOR_KEYS = {key: (key.lower(), info.get("unit", "")) for key, info in OBD_PIDS.items()}
 
-def _demo_sensors():
-    """Return simulated sensor readings that vary over time (all OBD_PIDS sensors)."""
-    global _demo_tick
-    with _demo_lock:
-        _demo_tick += 1
-    t = _demo_tick * 0.15
-    return {
-        # ── Core gauges ────────────────────────────────────────────────
-        "rpm":               {"value": round(800 + 1350 * (1 + math.sin(t)) + random.uniform(-50, 50), 1),
-                              "unit": "rpm",   "error": None},
-        "speed":             {"value": round(max(0, 60 + 50 * math.sin(t * 0.4) + random.uniform(-3, 3)), 1),
-                              "unit": "km/h",  "error": None},
-        "coolant_temp":      {"value": round(90 + 3 * math.sin(t * 0.1) + random.uniform(-0.5, 0.5), 1),
-                              "unit": "°C",    "error": None},
-        "throttle":          {"value": round(max(5, min(95, 35 + 25 * math.sin(t * 0.5) + random.uniform(-2, 2))), 1),
-                              "unit": "%",     "error": None},
-        "engine_load":       {"value": round(max(10, min(90, 40 + 20 * math.sin(t * 0.3) + random.uniform(-2, 2))), 1),
-                              "unit": "%",     "error": None},
-        "fuel_level":        {"value": round(max(0, 65.0 - _demo_tick * 0.01), 1),
-                              "unit": "%",     "error": None},
-        "intake_temp":       {"value": round(28 + 4 * math.sin(t * 0.08) + random.uniform(-0.5, 0.5), 1),
-                              "unit": "°C",    "error": None},
-        "maf":               {"value": round(max(2, 9 + 4 * math.sin(t * 0.6) + random.uniform(-0.3, 0.3)), 2),
-                              "unit": "g/s",   "error": None},
-        "timing_advance":    {"value": round(12 + 6 * math.sin(t * 0.2) + random.uniform(-0.5, 0.5), 1),
-                              "unit": "°",     "error": None},
-        "voltage":           {"value": round(13.8 + 0.4 * math.sin(t * 0.05) + random.uniform(-0.05, 0.05), 2),
-                              "unit": "V",     "error": None},
-        "oil_temp":          {"value": round(95 + 5 * math.sin(t * 0.07) + random.uniform(-0.5, 0.5), 1),
-                              "unit": "°C",    "error": None},
-        # ── Additional gauges (matching CLI dash) ──────────────────────
-        "map":               {"value": round(100 + 10 * math.sin(t * 0.4) + random.uniform(-1, 1), 1),
-                              "unit": "kPa",   "error": None},
-        "fuel_rate":         {"value": round(max(0.5, 5 + 3 * math.sin(t * 0.5) + random.uniform(-0.2, 0.2)), 2),
-                              "unit": "L/h",   "error": None},
-        "short_fuel_trim_1": {"value": round(random.uniform(-5, 5), 1),
-                              "unit": "%",     "error": None},
-        "long_fuel_trim_1":  {"value": round(1.5 + 0.5 * math.sin(t * 0.02), 1),
-                              "unit": "%",     "error": None},
-        "baro_pressure":     {"value": round(101 + 0.5 * math.sin(t * 0.01), 1),
-                              "unit": "kPa",   "error": None},
-        "ambient_temp":      {"value": round(25 + 2 * math.sin(t * 0.005), 1),
-                              "unit": "°C",    "error": None},
-        "abs_load":          {"value": round(max(10, min(90, 42 + 18 * math.sin(t * 0.3) + random.uniform(-2, 2))), 1),
-                              "unit": "%",     "error": None},
-        # ── Trip / statistics ──────────────────────────────────────────
-        "runtime":           {"value": _demo_tick,
-                              "unit": "s",     "error": None},
-        "distance_mil":      {"value": 0,
-                              "unit": "km",    "error": None},
-        "distance_since_clr": {"value": 500 + _demo_tick // _DEMO_DISTANCE_INCREMENT,
-                              "unit": "km",    "error": None},
-        "warmups_since_clr": {"value": 5,
-                              "unit": "count", "error": None},
-        "evap_pressure":     {"value": round(random.uniform(-50, 50), 1),
-                              "unit": "Pa",    "error": None},
-    }
+
+def _sensor_schema(pairs) -> dict:
+    """Return the /api/sensors/schema payload for ``(name, unit)`` *pairs*."""
+    names, units = zip(*pairs)
+    return {"names": list(names), "units": list(units)}
+
+
+# Order of the positional "values" in /api/stream events, per data source
+_DEMO_SENSOR_SCHEMA = _sensor_schema(
+    (name, info["unit"]) for name, info in _compute_demo_sensors(0).items())
+_LIVE_SENSOR_SCHEMA = _sensor_schema(_LIVE_SENSOR_KEYS[key] for key in BULK_SCAN_KEYS)
+
+# Stand-in for a sensor missing from a reading
+_NO_READING = {"value": None}
+
+# Every sensor entry produced by _get_sensors carries these fields; "error" is
+# only present on entries that failed
+_sensor_fields = operator.itemgetter("value", "unit")
+
+# Column row of the /api/export CSV
+_EXPORT_CSV_HEADER = ("timestamp", "sensor", "value", "unit", "error")
+
+
+# ---------------------------------------------------------------------------
+# SSE fan-out
+# ---------------------------------------------------------------------------
+
+class _StreamHub:
+    """Builds each /api/stream event once and shares it with every client.
+
+    A single producer thread runs while at least one client is subscribed,
+    publishing ``(sequence, payload)`` on a fixed monotonic-clock cadence and
+    waking every waiting client at once.  Slow clients simply skip to the
+    newest event instead of queueing old ones.
+    """
+
+    def __init__(self, build: Callable[[], bytes], interval: Callable[[], float]):
+        self._build = build
+        self._interval = interval
+        self._cond = threading.Condition()
+        self._clients = 0
+        self._thread: Optional[threading.Thread] = None
+        self._latest = (0, b"")
+
+    def subscribe(self) -> None:
+        with self._cond:
+            self._clients += 1
+            self._ensure_producer()
+
+    def unsubscribe(self) -> None:
+        with self._cond:
+            self._clients -= 1
+
+    def wait(self, last_seq: int) -> Optional[tuple]:
+        """Block until an event newer than *last_seq* exists; return ``(seq, payload)``.
+
+        Pass 0 to get the current event right away if one has been published.
+        Returns None if nothing new arrives within a couple of intervals, so
+        callers never block indefinitely on a stalled producer.
+        """
+        with self._cond:
+            if self._cond.wait_for(lambda: self._latest[0] != last_seq and self._latest[1],
+                                   timeout=2 * self._interval() + 1.0):
+                return self._latest
+            # Restart the producer if it went away while clients remain
+            self._ensure_producer()
+            return None
+
+    def _ensure_producer(self) -> None:
+        # Caller holds self._cond
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        seq = self._latest[0]
+        deadline = time.monotonic()
+        try:
+            while True:
+                with self._cond:
+                    if not self._clients:
+                        # Drop the last payload so a future client never sees a stale event
+                        self._latest = (seq, b"")
+                        self._thread = None
+                        return
+                try:
+                    payload = self._build()
+                except Exception as exc:
+                    # A failed read must not end the stream for every client
+                    logger.error("[WEB][ERROR] Stream event failed: %s", exc)
+                    payload = b"data: " + _to_json_bytes({"error": str(exc)}) + b"\n\n"
+                seq += 1
+                with self._cond:
+                    self._latest = (seq, payload)
+                    self._cond.notify_all()
+                # Sleep to the next deadline so build time does not add drift
+                deadline += self._interval()
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    deadline = time.monotonic()
+        finally:
+            # On an unexpected exit let the next subscriber start a new producer
+            with self._cond:
+                if self._thread is threading.current_thread():
+                    self._latest = (seq, b"")
+                    self._thread = None
 
 
 # ---------------------------------------------------------------------------
@@ -101,6 +347,8 @@ def create_app(connector=None, reader=None, writer=None, demo=False, stream_inte
         Seconds between Server-Sent Event pushes on /api/stream.
     """
     app = Flask(__name__, template_folder="templates")
+    if orjson is not None:
+        app.json = _OrjsonProvider(app)
     app.config["DEMO"] = demo
     app.config["CONNECTOR"] = connector
     app.config["READER"] = reader
@@ -111,32 +359,71 @@ def create_app(connector=None, reader=None, writer=None, demo=False, stream_inte
     # Helpers
     # ------------------------------------------------------------------
 
-    def _get_sensors():
-        if app.config["DEMO"] or app.config["READER"] is None:
-            return _demo_sensors()
+    # The data sources are fixed for the app's lifetime, so demo vs live is
+    # decided once here instead of on every request
+    demo_data = demo or reader is None
+    demo_writer = demo or writer is None
+
+    # Last live status: [monotonic time, status dict or None]
+    status_cache = [0.0, None]
+
+    # Last live reading: [monotonic time it finished, sensors dict or None].
+    # The lock keeps a single scan on the adapter; callers queued behind it
+    # take its result instead of starting another.
+    sensors_cache = [0.0, None]
+    sensors_lock = threading.Lock()
+
+    def _get_live_sensors():
+        requested = time.monotonic()
+        with sensors_lock:
+            finished_at, sensors = sensors_cache
+            if sensors is None or requested - finished_at > _LIVE_SENSORS_MAX_AGE:
+                sensors = _read_live_sensors()
+                sensors_cache[:] = (time.monotonic(), sensors)
+            return sensors
+
+    def _read_live_sensors():
         try:
-            raw = app.config["READER"].read_all()
-            # Convert OBDReader dict format {key: value} to web format {key: {value, unit, error}}
-            from obd.commands import OBD_PIDS
+            raw = reader.read_all()
+            # Convert OBDReader dict format {key: value} to web format {key: {value, unit}}
+            keys = _LIVE_SENSOR_KEYS
             out = {}
             for k, v in raw.items():
-                info = OBD_PIDS.get(k, {})
-                out[k.lower()] = {"value": v, "unit": info.get("unit", ""), "error": None}
+                name, unit = keys.get(k) or (k.lower(), "")
+                out[name] = {"value": v, "unit": unit}
             return out
         except Exception as exc:
             return {"error": {"value": None, "unit": None, "error": str(exc)}}
 
-    def _get_status():
-        if app.config["DEMO"]:
-            return {"connected": True, "port": "DEMO", "mode": "demo"}
-        conn = app.config["CONNECTOR"]
-        if conn is None:
-            return {"connected": False, "port": None, "mode": None}
-        return {
-            "connected": conn.is_connected(),
-            "port": conn.port,
-            "mode": type(conn).__name__,
-        }
+    def _get_live_status():
+        # is_connected() may touch the port; stream pushes and status polls
+        # within the TTL share one answer
+        now = time.monotonic()
+        cached_at, status = status_cache
+        if status is None or now - cached_at >= _STATUS_CACHE_TTL:
+            status = {
+                "connected": connector.is_connected(),
+                "port": connector.port,
+                "mode": type(connector).__name__,
+            }
+            status_cache[:] = (now, status)
+        return status
+
+    _get_sensors = _demo_sensors if demo_data else _get_live_sensors
+    sensor_schema = _DEMO_SENSOR_SCHEMA if demo_data else _LIVE_SENSOR_SCHEMA
+    sensor_schema_json = _to_json(sensor_schema)
+    schema_names = frozenset(sensor_schema["names"])
+    # Single source of status for /api/status and the stream, as encoded JSON;
+    # fixed statuses are encoded once
+    if demo or connector is None:
+        fixed_status_json = _to_json_bytes(_DEMO_STATUS if demo else _NO_CONNECTOR_STATUS)
+        _get_status_json = lambda: fixed_status_json
+    else:
+        _get_status_json = lambda: _to_json_bytes(_get_live_status())
+
+    def _invalidate_status():
+        # Raw commands and DTC clears can change the adapter state
+        status_cache[1] = None
 
     # ------------------------------------------------------------------
     # Routes
@@ -144,124 +431,169 @@ def create_app(connector=None, reader=None, writer=None, demo=False, stream_inte
 
     @app.route("/")
     def index():
-        return render_template("index.html", demo=app.config["DEMO"])
+        return render_template("index.html", demo=demo)
 
     @app.route("/api/status")
     def api_status():
-        return jsonify(_get_status())
+        return _json_response(_get_status_json())
 
     @app.route("/api/sensors")
     def api_sensors():
+        if demo_data:
+            return _json_response(f'{{"sensors":{_demo_sensors_json()}}}')
         return jsonify({"sensors": _get_sensors()})
 
+    @app.route("/api/sensors/schema")
+    def api_sensors_schema():
+        return _json_response(sensor_schema_json)
+
     @app.route("/api/dtc")
     def api_dtc():
-        if app.config["DEMO"] or app.config["READER"] is None:
-            return jsonify({"codes": _DEMO_DTCS})
+        if demo_data:
+            return _json_response(_DEMO_DTC_JSON)
         try:
-            codes = app.config["READER"].read_dtcs()
+            codes = reader.read_dtcs()
             return jsonify({"codes": codes})
         except Exception as exc:
             return jsonify({"codes": [], "error": str(exc)})
 
     @app.route("/api/dtc/pending")
     def api_dtc_pending():
-        if app.config["DEMO"] or app.config["READER"] is None:
-            return jsonify({"codes": _DEMO_PENDING_DTCS})
+        if demo_data:
+            return _json_response(_DEMO_PENDING_DTC_JSON)
         try:
-            codes = app.config["READER"].read_pending_dtcs()
+            codes = reader.read_pending_dtcs()
             return jsonify({"codes": codes})
         except Exception as exc:
             return jsonify({"codes": [], "error": str(exc)})
 
     @app.route("/api/dtc/clear", methods=["POST"])
     def api_dtc_clear():
-        if app.config["DEMO"] or app.config["READER"] is None:
-            return jsonify({"success": True, "demo": True})
+        if demo_data:
+            return _json_response(_DEMO_DTC_CLEAR_JSON)
         try:
-            resp = app.config["READER"].clear_dtcs()
+            resp = reader.clear_dtcs()
             # clear_dtcs returns the raw ELM327 response; treat non-empty as success
             success = bool(resp) and not str(resp).upper().startswith("ERROR")
             return jsonify({"success": success, "response": resp})
         except Exception as exc:
             return jsonify({"success": False, "error": str(exc)})
+        finally:
+            _invalidate_status()
 
     @app.route("/api/vehicle_info")
     def api_vehicle_info():
-        if app.config["DEMO"] or app.config["READER"] is None:
-            return jsonify({
-                "vin": "1G1JC5SH3A4100001",
-                "ecu_name": "DEMO ECU",
-                "calibration_id": "DEMO-CAL-001",
-                "protocol": "ISO 15765-4 CAN (11 bit, 500 kbaud)",
-                "elm_version": "ELM327 v2.1",
-                "battery_voltage": "12.6V",
-            })
-        rdr = app.config["READER"]
+        if demo_data:
+            return _json_response(_DEMO_VEHICLE_INFO_JSON)
         try:
             return jsonify({
-                "vin": rdr.read_vin(),
-                "ecu_name": rdr.read_ecu_name(),
-                "calibration_id": rdr.read_calibration_id(),
-                "protocol": rdr.get_protocol(),
-                "elm_version": rdr.get_elm_version(),
-                "battery_voltage": rdr.get_battery_voltage(),
+                "vin": reader.read_vin(),
+                "ecu_name": reader.read_ecu_name(),
+                "calibration_id": reader.read_calibration_id(),
+                "protocol": reader.get_protocol(),
+                "elm_version": reader.get_elm_version(),
+                "battery_voltage": reader.get_battery_voltage(),
             })
         except Exception as exc:
             return jsonify({"error": str(exc)})
 
     @app.route("/api/mil")
     def api_mil():
-        if app.config["DEMO"] or app.config["READER"] is None:
-            return jsonify({"mil_on": False, "dtc_count": 0})
+        if demo_data:
+            return _json_response(_DEMO_MIL_JSON)
         try:
-            status = app.config["READER"].read_mil_status()
+            status = reader.read_mil_status()
             return jsonify(status)
         except Exception as exc:
             return jsonify({"mil_on": None, "error": str(exc)})
 
     @app.route("/api/command", methods=["POST"])
     def api_command():
-        body = request.get_json(silent=True) or {}
+        # Only JSON bodies: a text/plain POST is a "simple" cross-origin
+        # request browsers send without preflight, and this route reaches the
+        # adapter. Tiny payloads, so the raw body is decoded directly.
+        data = request.get_data() if request.is_json else b""
+        try:
+            body = app.json.loads(data) if data else {}
+        except ValueError:
+            body = {}
+        if not isinstance(body, dict):
+            body = {}
         command = body.get("command", "").strip()
         if not command:
             return jsonify({"response": "", "error": "No command provided"}), 400
-        if app.config["DEMO"] or app.config["WRITER"] is None:
+        if demo_writer:
             return jsonify({"response": f"DEMO> {command}\r\nOK"})
         try:
-            response = app.config["WRITER"].send_raw(command)
+            response = writer.send_raw(command)
             return jsonify({"response": response})
         except Exception as exc:
             return jsonify({"response": "", "error": str(exc)})
+        finally:
+            _invalidate_status()
 
     @app.route("/api/export")
     def api_export():
         sensors = _get_sensors()
-        timestamp = datetime.now().isoformat()
-        lines = ["timestamp,sensor,value,unit,error"]
-        for name, info in sensors.items():
-            lines.append(f"{timestamp},{name},{info.get('value','')},{info.get('unit','')},{info.get('error','')}")
-        csv_data = "\n".join(lines)
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # One clock read for both the rows and the file name
+        now = datetime.now()
+        timestamp = now.isoformat()
+
+        # A snapshot is a few dozen rows: build it in one buffer and send it whole
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        writer.writerow(_EXPORT_CSV_HEADER)
+        writer.writerows((timestamp, name, *_sensor_fields(info), info.get("error"))
+                         for name, info in sensors.items())
+
+        ts = now.strftime("%Y%m%d_%H%M%S")
         return Response(
-            csv_data,
+            buf.getvalue(),
             mimetype="text/csv",
             headers={"Content-Disposition": f"attachment; filename=obd2_data_{ts}.csv"},
         )
 
+    def _build_stream_event() -> bytes:
+        # Only the values travel per push, in /api/sensors/schema order; the
+        # page fetches names and units once
+        sensors = _get_sensors()
+        failure = sensors.get("error")
+        if failure:
+            # No values on a failed read, so the page keeps its last readings
+            readings = b'"error":' + _to_json_bytes(failure["error"])
+        else:
+            values = [sensors.get(name, _NO_READING)["value"] for name in sensor_schema["names"]]
+            readings = b'"values":' + _to_json_bytes(values)
+            if not demo_data and not schema_names.issuperset(sensors):
+                # A reader returning keys outside the schema still gets them to
+                # the page, as full {value, unit} entries
+                extra = {name: info for name, info in sensors.items() if name not in schema_names}
+                readings += b',"extra":' + _to_json_bytes(extra)
+        status_json = _get_status_json()
+        ts = datetime.now().isoformat().encode()
+        # Join pre-encoded pieces as bytes; nothing is re-encoded on the way out
+        return b"".join((b"data: {", readings, b',"status":', status_json,
+                         b',"timestamp":"', ts, b'"}\n\n'))
+
+    stream_hub = _StreamHub(_build_stream_event, lambda: app.config.get("STREAM_INTERVAL", 2))
+
     @app.route("/api/stream")
     def api_stream():
-        interval = app.config.get("STREAM_INTERVAL", 2)
-
-        @stream_with_context
         def generate():
-            while True:
-                sensors = _get_sensors()
-                status  = _get_status()
-                payload = json.dumps({"sensors": sensors, "status": status,
-                                      "timestamp": datetime.now().isoformat()})
-                yield f"data: {payload}\n\n"
-                time.sleep(interval)
+            stream_hub.subscribe()
+            try:
+                seq = 0
+                while True:
+                    event = stream_hub.wait(seq)
+                    if event is None:
+                        # SSE comment: keeps proxies from timing out and lets the
+                        # server notice a client that has gone away
+                        yield b": keepalive\n\n"
+                        continue
+                    seq, payload = event
+                    yield payload
+            finally:
+                stream_hub.unsubscribe()
 
         return Response(generate(), mimetype="text/event-stream",
                         headers={"Cache-Control": "no-cache",